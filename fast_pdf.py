@@ -0,0 +1,295 @@
+# Direct PDF writer for the fixed order layout.
+#
+# Every order is the same one-page, two-column form, so instead of running
+# fpdf for each document this module writes the PDF objects itself. The TTF
+# is read and subset once per process (through PyFPDF's TTF reader) for
+# FONT_CHARS, and those font objects are copied into every document. Orders
+# using characters outside that set get None back and are rendered with fpdf.
+#
+# The layout constants below are also used by PDFGenerator.header and
+# print_column_fields in main.py, which draw the same page with fpdf: same
+# page size, margins, font sizes, line breaking and positions. Labels and
+# values are drawn with the same font program, as they are there.
+
+import operator
+import re
+import struct
+import zlib
+from datetime import datetime
+from functools import reduce
+
+try:
+    from fpdf.ttfonts import TTFontFile
+    FAST_PDF_AVAILABLE = True
+except ImportError:  # fpdf2 does not ship PyFPDF's TTF reader
+    FAST_PDF_AVAILABLE = False
+
+K = 72 / 25.4  # points per mm
+PAGE_W, PAGE_H = 612.0, 792.0  # Letter, portrait, in points
+MARGIN = 28.35 / K  # fpdf's default page margin, in mm
+CELL_MARGIN = MARGIN / 10
+
+TITLE_SIZE, LABEL_SIZE, VALUE_SIZE = 12, 14, 10
+TITLE_HEIGHT = 10
+LINE_HEIGHT = 6
+FIELD_GAP = 4
+COLUMNS_TOP = 25
+
+FONT_CHARS = frozenset(
+    map(chr, [*range(1, 127), *range(160, 256), *range(0x400, 0x460)])
+) | frozenset("–—‘’‚“”„…•€№")
+
+_TO_UNICODE = (
+    b"/CIDInit /ProcSet findresource begin\n"
+    b"12 dict begin\n"
+    b"begincmap\n"
+    b"/CIDSystemInfo <</Registry (Adobe) /Ordering (UCS) /Supplement 0>> def\n"
+    b"/CMapName /Adobe-Identity-UCS def\n"
+    b"/CMapType 2 def\n"
+    b"1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+    b"1 beginbfrange\n<0000> <FFFF> <0000>\nendbfrange\n"
+    b"endcmap\n"
+    b"CMapName currentdict /CMap defineresource pop\n"
+    b"end\n"
+    b"end"
+)
+
+# Object numbers. Everything except the page content and the info dictionary
+# is the same in every document and is written once per process.
+CATALOG, PAGES, PAGE, CONTENT, RESOURCES = 1, 2, 3, 4, 5
+TYPE0, CIDFONT, TO_UNICODE, DESCRIPTOR, CIDTOGID, FONTFILE, INFO = 6, 7, 8, 9, 10, 11, 12
+
+_fonts = {}
+
+
+class _Font:
+    def __init__(self, font_path):
+        ttf = TTFontFile()
+        ttf.getMetrics(font_path)
+        self.widths = ttf.charWidths
+        self.missing_width = int(round(ttf.defaultWidth))
+
+        subset = TTFontFile()
+        program = subset.makeSubset(font_path, sorted(map(ord, FONT_CHARS)))
+        self.chars = frozenset(map(chr, subset.codeToGlyph))
+        cid_to_gid = bytearray(256 * 256 * 2)
+        for cid, glyph in subset.codeToGlyph.items():
+            struct.pack_into(">H", cid_to_gid, cid * 2, glyph)
+
+        name = "CSVPDF+" + re.sub("[ ()]", "", ttf.fullName)
+        widths = " ".join(
+            "%d [%s]" % (run[0], " ".join(str(self._width(chr(c))) for c in run))
+            for run in _runs(sorted(map(ord, self.chars)))
+        )
+        flags = (ttf.flags | 4) & ~32
+        bbox = "[%d %d %d %d]" % tuple(int(round(v)) for v in ttf.bbox)
+
+        objects = [
+            (CATALOG, b"<</Type /Catalog /Pages %d 0 R>>" % PAGES),
+            (PAGES, b"<</Type /Pages /Kids [%d 0 R] /Count 1 /MediaBox [0 0 %.2f %.2f]>>"
+             % (PAGE, PAGE_W, PAGE_H)),
+            (PAGE, b"<</Type /Page /Parent %d 0 R /Resources %d 0 R /Contents %d 0 R>>"
+             % (PAGES, RESOURCES, CONTENT)),
+            (RESOURCES, b"<</ProcSet [/PDF /Text] /Font <</F1 %d 0 R>>>>" % TYPE0),
+            (TYPE0, ("<</Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+                     "/DescendantFonts [%d 0 R] /ToUnicode %d 0 R>>"
+                     % (name, CIDFONT, TO_UNICODE)).encode("latin-1")),
+            (CIDFONT, ("<</Type /Font /Subtype /CIDFontType2 /BaseFont /%s "
+                       "/CIDSystemInfo <</Registry (Adobe) /Ordering (UCS) /Supplement 0>> "
+                       "/FontDescriptor %d 0 R /DW %d /W [%s] /CIDToGIDMap %d 0 R>>"
+                       % (name, DESCRIPTOR, self.missing_width, widths, CIDTOGID)).encode("latin-1")),
+            (TO_UNICODE, _stream(_TO_UNICODE)),
+            (DESCRIPTOR, ("<</Type /FontDescriptor /FontName /%s /Ascent %d /Descent %d "
+                          "/CapHeight %d /Flags %d /FontBBox %s /ItalicAngle %d /StemV %d "
+                          "/MissingWidth %d /FontFile2 %d 0 R>>"
+                          % (name, round(ttf.ascent), round(ttf.descent), round(ttf.capHeight),
+                             flags, bbox, int(ttf.italicAngle), round(ttf.stemV),
+                             self.missing_width, FONTFILE)).encode("latin-1")),
+            (CIDTOGID, _stream(zlib.compress(bytes(cid_to_gid)), b"/Filter /FlateDecode")),
+            (FONTFILE, _stream(zlib.compress(program),
+                               b"/Filter /FlateDecode /Length1 %d" % len(program))),
+        ]
+        self.prefix = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets = {}
+        _put_objects(self.prefix, self.offsets, objects)
+        self._advances = {}
+        self._labels = {}
+
+    def _width(self, char):
+        # Glyph width in 1/1000 em, with PyFPDF's fallbacks.
+        code = ord(char)
+        if code < len(self.widths):
+            return self.widths[code]
+        return self.missing_width or 500
+
+    def string_width(self, text, size):
+        # In mm, as FPDF.get_string_width.
+        return sum(map(self._width, text)) * (size / K) / 1000.0
+
+    def advances(self, size):
+        # Each subset character's advance as multi_cell adds it up, per size.
+        if size not in self._advances:
+            font_size = size / K
+            self._advances[size] = {
+                c: self._width(c) * font_size / 1000.0 / font_size * 1000.0
+                for c in self.chars
+            }
+        return self._advances[size]
+
+    def label_lines(self, label, width):
+        # Labels are the same in every document, so wrap each one once.
+        key = (label, width)
+        if key not in self._labels:
+            self._labels[key] = self.wrap(f"{label}:", width, LABEL_SIZE)
+        return self._labels[key]
+
+    def wrap(self, text, width, size):
+        # PyFPDF's multi_cell line breaking for left-aligned text.
+        font_size = size / K
+        wmax = (width - 2 * CELL_MARGIN) * 1000.0 / font_size
+        advances = self.advances(size)
+        if "\n" not in text and "\r" not in text:
+            # Most values fit on one line. Summed in the loop's order, the
+            # total is the same float the loop would compare against wmax.
+            try:
+                if reduce(operator.add, map(advances.__getitem__, text), 0) <= wmax:
+                    return [text]
+            except KeyError:
+                pass  # not in the subset; emit_order falls back for these
+        s = text.replace("\r", "")
+        nb = len(s)
+        if nb > 0 and s[nb - 1] == "\n":
+            nb -= 1
+        lines = []
+        sep = -1
+        i = j = 0
+        length = 0
+        while i < nb:
+            c = s[i]
+            if c == "\n":
+                lines.append(s[j:i])
+                i += 1
+                sep = -1
+                j = i
+                length = 0
+                continue
+            if c == " ":
+                sep = i
+            if c in advances:
+                length += advances[c]
+            else:
+                length += self._width(c) * font_size / 1000.0 / font_size * 1000.0
+            if length > wmax:
+                if sep == -1:
+                    if i == j:
+                        i += 1
+                    lines.append(s[j:i])
+                else:
+                    lines.append(s[j:sep])
+                    i = sep + 1
+                sep = -1
+                j = i
+                length = 0
+            else:
+                i += 1
+        lines.append(s[j:i])
+        return lines
+
+
+def _runs(codes):
+    # Split sorted integers into runs of consecutive values.
+    run = []
+    for code in codes:
+        if run and code != run[-1] + 1:
+            yield run
+            run = []
+        run.append(code)
+    if run:
+        yield run
+
+
+def _put_objects(out, offsets, objects):
+    for number, body in objects:
+        offsets[number] = len(out)
+        out += b"%d 0 obj\n" % number
+        out += body
+        out += b"\nendobj\n"
+
+
+def _stream(data, extra=b""):
+    if extra:
+        extra = b" " + extra
+    return b"<</Length %d%s>>\nstream\n%s\nendstream" % (len(data), extra, data)
+
+
+def load_font(font_path):
+    # The parsed and subset font for font_path, built once per process.
+    if font_path not in _fonts:
+        _fonts[font_path] = _Font(font_path)
+    return _fonts[font_path]
+
+
+def use_font(font_path, font):
+    # Install a font built by load_font in another process (it pickles), so
+    # this one doesn't parse the TTF again.
+    _fonts[font_path] = font
+
+
+def _text(ops, x, y, text):
+    ops.append(b"1 0 0 1 %.2f %.2f Tm <%s> Tj" % (x * K, (PAGE_H / K - y) * K,
+                                                  text.encode("utf-16-be").hex().encode()))
+
+
+def emit_order(field_pairs_left, field_pairs_right, order_number, font_path):
+    # Returns the finished PDF as bytes, or None when the order uses
+    # characters that are not in the embedded font subset.
+    font = load_font(font_path)
+    page_w = PAGE_W / K
+    col_width = (page_w - MARGIN - MARGIN) / 2
+    title = f"Order Number {order_number}"
+
+    labels, values = [], []
+    for start_x, pairs in ((MARGIN, field_pairs_left), (MARGIN + col_width, field_pairs_right)):
+        y = COLUMNS_TOP
+        for label, value in pairs:
+            for line in font.label_lines(label, col_width):
+                labels.append((start_x + CELL_MARGIN, y, line))
+                y += LINE_HEIGHT
+            for line in font.wrap(value, col_width, VALUE_SIZE):
+                if line:
+                    values.append((start_x + CELL_MARGIN, y, line))
+                y += LINE_HEIGHT
+            y += FIELD_GAP
+
+    used = set(title)
+    for _, _, line in labels + values:
+        used.update(line)
+    if not used <= font.chars:
+        return None
+
+    # One text object, three font switches: title, then labels, then values.
+    ops = [b"BT", b"/F1 %.2f Tf" % TITLE_SIZE]
+    title_x = MARGIN + (page_w - MARGIN - MARGIN - font.string_width(title, TITLE_SIZE)) / 2.0
+    _text(ops, title_x, MARGIN + .5 * TITLE_HEIGHT + .3 * (TITLE_SIZE / K), title)
+    for size, lines in ((LABEL_SIZE, labels), (VALUE_SIZE, values)):
+        ops.append(b"/F1 %.2f Tf" % size)
+        baseline = .5 * LINE_HEIGHT + .3 * (size / K)
+        for x, y, line in lines:
+            _text(ops, x, y + baseline, line)
+    ops.append(b"ET")
+    content = zlib.compress(b"\n".join(ops))
+
+    created = datetime.now().strftime("%Y%m%d%H%M%S")
+    out = bytearray(font.prefix)
+    offsets = dict(font.offsets)
+    _put_objects(out, offsets, [
+        (CONTENT, _stream(content, b"/Filter /FlateDecode")),
+        (INFO, b"<</Producer (csv_to_pdf_orders) /CreationDate (D:%s)>>" % created.encode()),
+    ])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+    for number in range(1, len(offsets) + 1):
+        out += b"%010d 00000 n \n" % offsets[number]
+    out += b"trailer\n<</Size %d /Root %d 0 R /Info %d 0 R>>\n" % (len(offsets) + 1, CATALOG, INFO)
+    out += b"startxref\n%d\n%%%%EOF\n" % xref
+    return out
@@ -10,11 +10,30 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
 import platform
-import pandas as pd
-from fpdf import FPDF
+# pandas is imported inside the functions that read the CSV: it is most of
+# the app's startup time, and the worker processes never need it.
+from fpdf import FPDF, FPDF_VERSION
+import fast_pdf
+from fast_pdf import (
+    COLUMNS_TOP, FIELD_GAP, LABEL_SIZE, LINE_HEIGHT, TITLE_HEIGHT, TITLE_SIZE, VALUE_SIZE,
+)
 import re
+import copy
+import csv
+import io
+import json
+import hashlib
+import importlib.util
 import threading
+import zipfile
+import contextlib
+import asyncio
+import multiprocessing
 import subprocess
+from collections import deque, namedtuple
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Try to import the TkinterDnD wrapper for drag‑and‑drop
 try:
@@ -23,8 +42,25 @@ try:
 except ImportError:
     DND_AVAILABLE = False
 
+# pyarrow's CSV reader is faster than pandas' C parser; optional. Like
+# pandas, it is only imported once a CSV is read.
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
 stop_requested = False  # signal to stop processing
 
+# Progress is written here by the worker thread and copied onto the widgets
+# by poll_progress on the Tk thread, at most every PROGRESS_POLL_MS and
+# only when it changed since the last tick.
+PROGRESS_POLL_MS = 50
+progress_lock = threading.Lock()
+progress_state = {"value": 0, "maximum": 100, "text": "", "running": False}
+progress_shown = {}
+# Tk calls (dialogs, button states) requested by the worker thread, run by
+# poll_progress on the Tk thread.
+ui_calls = []
+# Per-order errors listed in the end-of-run summary dialog.
+MAX_ERRORS_SHOWN = 10
+
 
 def get_default_font_path():
     system = platform.system()
@@ -40,160 +76,801 @@ def get_default_font_path():
 
 FONT_PATH = get_default_font_path()
 
+# Legacy PyFPDF (1.x) builds the whole document in a str; fpdf2 does not.
+LEGACY_FPDF = FPDF_VERSION.startswith("1.")
+# _copy_fpdf2_fonts copies fpdf2's private TTFFont state; the attributes it
+# sets and SubsetMap's one-argument form only exist from fpdf2 2.8.5 on.
+# Older fpdf2 versions load the font for every document instead.
+FPDF2_FONT_COPIES = (
+    not LEGACY_FPDF and tuple(map(int, re.findall(r"\d+", FPDF_VERSION)[:3])) >= (2, 8, 5)
+)
+if FPDF2_FONT_COPIES:
+    from fontTools import ttLib
+    from fpdf.fonts import SubsetMap
+
+REQUIRED_COLUMNS = [
+    "Order Number",
+    "First Name (Billing)",
+    "Last Name (Billing)",
+    "Email (Billing)",
+    "Phone (Billing)",
+    "Item Name",
+    "SKU",
+    "Quantity (- Refund)",
+    "Item Cost",
+    "Order Total Amount",
+]
+OPTIONAL_COLUMNS = [
+    "Shipping Method Title",
+    "City (Billing)",
+    "Address 1&2 (Billing)",
+    "Customer Note",
+]
+USED_COLUMNS = frozenset(REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+# Columns of a prepared row, in order; the last two are derived in prepare_chunk.
+ROW_COLUMNS = REQUIRED_COLUMNS + OPTIONAL_COLUMNS + ["Full Name", "_safe_filename"]
+CHUNK_SIZE = 2048
+# Records count_csv_rows reads between checks for the end of the run.
+COUNT_BLOCK = 4096
+# Orders sent to a worker process per task, and finished PDFs being written
+# to disk at once.
+RENDER_BATCH = 32
+WRITE_LIMIT = 8
+# The page layout (positions, line height, font sizes) is defined in
+# fast_pdf, so fpdf draws the same page as its direct writer. The page size
+# matches fast_pdf.PAGE_W and PAGE_H.
+PAGE_FORMAT = "Letter"
+PAGE_ORIENTATION = "P"
+# Written into the output folder instead of loose PDFs when "Bundle to ZIP"
+# is checked. PDFs are already compressed, so entries are stored as is.
+BUNDLE_NAME = "orders.zip"
+# Row hashes of the PDFs already in the output folder, so reruns can skip them.
+HASH_MANIFEST = ".order_hashes.json"
+
+
+def _attr_name(column):
+    # "Address 1&2 (Billing)" -> "Address_1_2_bill"
+    return re.sub(r"\W+", "_", column.replace(" (Billing)", " bill")).strip("_")
+
+
+# Defined at module level (unlike itertuples' own namedtuples) so rows can be
+# pickled over to the worker processes.
+OrderRow = namedtuple("OrderRow", [_attr_name(c) for c in ROW_COLUMNS])
+
+# Fields printed in each column of the page, as (label, position in a row).
+LEFT_FIELDS = tuple(
+    (label, ROW_COLUMNS.index(column))
+    for label, column in (
+        ("Name", "Full Name"),
+        ("Email", "Email (Billing)"),
+        ("Phone", "Phone (Billing)"),
+        ("Shipping Method Title", "Shipping Method Title"),
+        ("City", "City (Billing)"),
+        ("Address 1&2", "Address 1&2 (Billing)"),
+    )
+)
+RIGHT_FIELDS = tuple(
+    (label, ROW_COLUMNS.index(column))
+    for label, column in (
+        ("Item Name", "Item Name"),
+        ("SKU", "SKU"),
+        ("Quantity", "Quantity (- Refund)"),
+        ("Item Cost", "Item Cost"),
+        ("Order Total Amount", "Order Total Amount"),
+        ("Customer Note", "Customer Note"),
+    )
+)
+
+
+# Characters not allowed in filenames, replaced with "_" by prepare_chunk.
+_FILENAME_RE = re.compile(r'[\\/:*?"<>|]')
+
 
-def sanitize_filename(filename: str) -> str:
-    invalid_chars = r'\/:*?"<>|'
-    return re.sub(f"[{re.escape(invalid_chars)}]", "_", filename)
+_FONT_CACHE = {}
+# The TTF file contents, read once per process for fpdf2's per-document copies.
+_FONT_BYTES = {}
+
+
+def _copy_font_state(fonts, font_files, diffs):
+    fonts = {key: dict(font, subset=list(font["subset"])) for key, font in fonts.items()}
+    font_files = {key: dict(info) for key, info in font_files.items()}
+    return fonts, font_files, dict(diffs)
+
+
+def _copy_fpdf2_fonts(fonts, font_path):
+    # fpdf2 subsets a font's parsed TTF in place when writing the document,
+    # so each document gets its own lazily read TTF and subset; the metrics
+    # computed from the cmap are shared. The TTF is read from memory rather
+    # than reopened from disk.
+    if font_path not in _FONT_BYTES:
+        with open(font_path, "rb") as f:
+            _FONT_BYTES[font_path] = f.read()
+    copies = {}
+    for key, font in fonts.items():
+        font = copy.copy(font)
+        font.ttfont = ttLib.TTFont(
+            io.BytesIO(_FONT_BYTES[font_path]), recalcTimestamp=False, lazy=True
+        )
+        font.subset = SubsetMap(font)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        copies[key] = font
+    return copies
 
 
 class PDFGenerator(FPDF):
-    def __init__(self, order_number, *args, **kwargs):
+    def __init__(self, order_number, *args, font_path=FONT_PATH, **kwargs):
         super().__init__(*args, **kwargs)
+        if LEGACY_FPDF:
+            self.buffer = bytearray()
         self.order_number = order_number
+        self.font_path = font_path
         try:
-            self.add_font("DefaultFont", "", FONT_PATH, uni=True)
-            self.add_font("DefaultFont", "B", FONT_PATH, uni=True)
+            self._add_default_fonts(font_path)
             self.set_auto_page_break(False)
         except Exception as e:
-            messagebox.showerror(
-                "Font Error",
-                f"Failed to load font from {FONT_PATH}.\nError: {e}"
-            )
-            raise
+            raise RuntimeError(
+                f"Failed to load font from {font_path}.\nError: {e}"
+            ) from e
+
+    def _add_default_fonts(self, font_path):
+        # Both fpdf versions parse the TTF on every add_font call, so parse
+        # it once per process and hand each document its own copy of the
+        # font state. Only the glyph subset is per-document state; the width
+        # table is shared read-only.
+        if not LEGACY_FPDF:
+            if not FPDF2_FONT_COPIES:
+                self.add_font("DefaultFont", "", font_path)
+                self.add_font("DefaultFont", "B", font_path)
+                return
+            if font_path not in _FONT_CACHE:
+                self.add_font("DefaultFont", "", font_path)
+                self.add_font("DefaultFont", "B", font_path)
+                _FONT_CACHE[font_path] = _copy_fpdf2_fonts(self.fonts, font_path)
+                return
+            self.fonts.update(_copy_fpdf2_fonts(_FONT_CACHE[font_path], font_path))
+            return
+        if font_path not in _FONT_CACHE:
+            self.add_font("DefaultFont", "", font_path, uni=True)
+            self.add_font("DefaultFont", "B", font_path, uni=True)
+            _FONT_CACHE[font_path] = _copy_font_state(self.fonts, self.font_files, self.diffs)
+            return
+        self.fonts, self.font_files, self.diffs = _copy_font_state(*_FONT_CACHE[font_path])
 
     def header(self):
-        self.set_font("DefaultFont", "B", 12)
+        self.set_font("DefaultFont", "B", TITLE_SIZE)
         title = f"Order Number {self.order_number}"
-        self.cell(0, 10, title, align="C", ln=1)
+        self.cell(0, TITLE_HEIGHT, title, align="C", ln=1)
         self.ln(3)
 
+    if LEGACY_FPDF:
+        # PyFPDF appends every line to a str buffer, which copies the whole
+        # document on each write. Page contents are still kept as str (fpdf
+        # edits them in place), only the document buffer becomes a bytearray.
+        def _out(self, s):
+            if self.state == 2:
+                super()._out(s)
+                return
+            if isinstance(s, str):
+                s = s.encode("latin-1")
+            elif not isinstance(s, (bytes, bytearray)):
+                s = str(s).encode("latin-1")
+            self.buffer += s
+            self.buffer += b"\n"
+
+        def output(self, name="", dest=""):
+            data = self.output_bytes()
+            if dest.upper() == "S":
+                return bytes(data)
+            write_file(name, data)
+            return ""
+
+    def output_bytes(self):
+        # The finished document, without going through a file object.
+        if not LEGACY_FPDF:
+            return self.output()
+        self.close()
+        return self.buffer
+
+
+def write_file(path, data):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def split_lines(pdf, text, width, line_height):
+    # Word-wrap text the way multi_cell would, without drawing it. Text that
+    # is clearly narrower than the cell is one line, without running
+    # multi_cell's character-by-character line breaking.
+    if "\n" not in text and "\r" not in text \
+            and pdf.get_string_width(text) < (width - 2 * pdf.c_margin) * (1 - 1e-9):
+        return [text]
+    if LEGACY_FPDF:
+        return pdf.multi_cell(width, line_height, text, align="L", split_only=True)
+    return pdf.multi_cell(width, line_height, text, align="L", dry_run=True, output="LINES")
+
+
+def drawable(pdf, line):
+    # fpdf2's text() fails (before 2.8) on characters the font has no glyph
+    # for, where multi_cell leaves them out; leave them out here too. Line
+    # breaks are unaffected: they are found with the characters still in.
+    if LEGACY_FPDF:
+        return line
+    cmap = pdf.current_font.cmap
+    return "".join(c for c in line if ord(c) in cmap)
+
+
+# Wrapped label lines by (label, column width). Labels are the same in every
+# document, so each is wrapped once per process.
+_LABEL_LINES = {}
+
+
+def print_column_fields(pdf, columns, start_y, col_width):
+    # Lay out both columns first, then draw every label in one bold pass and
+    # every value in one regular pass, placing each line where multi_cell
+    # would. columns is a list of (start_x, [(label, value), ...]).
+    pdf.set_font("DefaultFont", "", VALUE_SIZE)
+    wrapped_values = [
+        [split_lines(pdf, value, col_width, LINE_HEIGHT) for _, value in fields]
+        for _, fields in columns
+    ]
 
-def print_column_fields(pdf, fields, data, start_x, start_y, col_width):
-    current_y = start_y
-    line_height = 6
-    for label, key in fields:
-        pdf.set_xy(start_x, current_y)
-        pdf.set_font("DefaultFont", "B", 14)
-        pdf.multi_cell(col_width, line_height, f"{label}:", align="L")
-        current_y = pdf.get_y()
-        pdf.set_xy(start_x, current_y)
-        pdf.set_font("DefaultFont", "", 10)
-        pdf.multi_cell(col_width, line_height, str(data.get(key, "")).strip(), align="L")
-        current_y = pdf.get_y() + 4
-    return current_y
+    pdf.set_font("DefaultFont", "B", LABEL_SIZE)
+    baseline = .5 * LINE_HEIGHT + .3 * pdf.font_size
+    bottom = start_y
+    values = []
+    for (start_x, fields), column_values in zip(columns, wrapped_values):
+        text_x = start_x + pdf.c_margin
+        current_y = start_y
+        for (label, _), value_lines in zip(fields, column_values):
+            key = (label, col_width)
+            if key not in _LABEL_LINES:
+                _LABEL_LINES[key] = split_lines(pdf, f"{label}:", col_width, LINE_HEIGHT)
+            for line in _LABEL_LINES[key]:
+                pdf.text(text_x, current_y + baseline, drawable(pdf, line))
+                current_y += LINE_HEIGHT
+            values.append((text_x, current_y, value_lines))
+            current_y += len(value_lines) * LINE_HEIGHT + FIELD_GAP
+        bottom = max(bottom, current_y)
+
+    pdf.set_font("DefaultFont", "", VALUE_SIZE)
+    baseline = .5 * LINE_HEIGHT + .3 * pdf.font_size
+    for text_x, y, value_lines in values:
+        for line in value_lines:
+            if line:
+                pdf.text(text_x, y + baseline, drawable(pdf, line))
+            y += LINE_HEIGHT
+    return bottom
+
+
+_LAYOUT = None
+
+
+def render_order(order, font_path=FONT_PATH):
+    left_fields = [(label, order[i]) for label, i in LEFT_FIELDS]
+    right_fields = [(label, order[i]) for label, i in RIGHT_FIELDS]
+    if fast_pdf.FAST_PDF_AVAILABLE:
+        # Same page written directly; fpdf only handles orders whose
+        # characters fall outside fast_pdf's embedded font subset.
+        data = fast_pdf.emit_order(left_fields, right_fields, order.Order_Number, font_path)
+        if data is not None:
+            return data
+
+    pdf = PDFGenerator(
+        order.Order_Number, format=PAGE_FORMAT, orientation=PAGE_ORIENTATION, font_path=font_path
+    )
+    pdf.add_page()
+    left_x, right_x, col_w = page_layout(pdf)
+    print_column_fields(pdf, [(left_x, left_fields), (right_x, right_fields)], COLUMNS_TOP, col_w)
+    return pdf.output_bytes()
+
+
+def page_layout(pdf):
+    # Column origins and width depend only on PAGE_FORMAT and fpdf's default
+    # margins, so they are read off the first page once per process.
+    global _LAYOUT
+    if _LAYOUT is None:
+        col_w = (pdf.w - pdf.l_margin - pdf.r_margin) / 2
+        _LAYOUT = (pdf.l_margin, pdf.l_margin + col_w, col_w)
+    return _LAYOUT
+
+
+def _shared_font(font_path):
+    # fast_pdf's font, parsed once in this process and passed to every
+    # worker through _init_worker. None when there is nothing to share.
+    if not fast_pdf.FAST_PDF_AVAILABLE:
+        return None
+    try:
+        return fast_pdf.load_font(font_path)
+    except Exception:
+        return None
+
+
+def _init_worker(font_path, font=None):
+    # Runs once in each worker process as it starts: install the font the
+    # parent already parsed, or load it here, instead of in the worker's
+    # first task. (fpdf2 parses the font per document, so there is nothing
+    # to load ahead without fast_pdf.) A font that fails to load is reported
+    # per order by _render_batch.
+    if font is not None:
+        fast_pdf.use_font(font_path, font)
+    elif fast_pdf.FAST_PDF_AVAILABLE:
+        try:
+            fast_pdf.load_font(font_path)
+        except Exception:
+            pass
 
 
-def generate_pdf(data, output_path, order_number):
-    try:
-        pdf = PDFGenerator(order_number, format="Letter", orientation="P")
-        pdf.add_page()
-        full = f"{data.get('First Name (Billing)', '').strip()} {data.get('Last Name (Billing)', '').strip()}".strip()
-        data["Full Name"] = full
-        left_fields = [
-            ("Name", "Full Name"),
-            ("Email", "Email (Billing)"),
-            ("Phone", "Phone (Billing)"),
-            ("Shipping Method Title", "Shipping Method Title"),
-            ("City", "City (Billing)"),
-            ("Address 1&2", "Address 1&2 (Billing)"),
-        ]
-        right_fields = [
-            ("Item Name", "Item Name"),
-            ("SKU", "SKU"),
-            ("Quantity", "Quantity (- Refund)"),
-            ("Item Cost", "Item Cost"),
-            ("Order Total Amount", "Order Total Amount"),
-            ("Customer Note", "Customer Note"),
-        ]
-        available_w = pdf.w - pdf.l_margin - pdf.r_margin
-        col_w = available_w / 2
-        start_y = 25
-        print_column_fields(pdf, left_fields, data, pdf.l_margin, start_y, col_w)
-        print_column_fields(pdf, right_fields, data, pdf.l_margin + col_w, start_y, col_w)
-        pdf.output(output_path)
-    except Exception as e:
-        messagebox.showerror(
-            "PDF Generation Error",
-            f"Failed for order {order_number}.\nDetails: {e}"
-        )
-        raise
+def _render_batch(orders, font_path):
+    # Runs in a worker process: no Tk calls and no disk writes here. Returns
+    # (pdf bytes, None) or (None, error message) per order.
+    results = []
+    for order in orders:
+        try:
+            results.append((render_order(order, font_path), None))
+        except Exception as e:
+            results.append((None, f"Failed for order {order.Order_Number}.\nDetails: {e}"))
+    return results
 
 
 def validate_csv(df):
-    required = [
-        "Order Number",
-        "First Name (Billing)",
-        "Last Name (Billing)",
-        "Email (Billing)",
-        "Phone (Billing)",
-        "Item Name",
-        "SKU",
-        "Quantity (- Refund)",
-        "Item Cost",
-        "Order Total Amount",
-    ]
-    return [c for c in required if c not in df.columns]
+    columns = set(df.columns)
+    return [c for c in REQUIRED_COLUMNS if c not in columns]
+
+
+def count_csv_rows(csv_path, finished):
+    # Data rows in the file, or None if the run finished first.
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        count = -1  # the header
+        while not finished.is_set():
+            block = list(islice(reader, COUNT_BLOCK))
+            if not block:
+                return count
+            count += sum(map(bool, block))
+    return None
+
+
+def count_in_background(csv_path, finished):
+    # Counting a large file takes minutes, so rendering starts without the
+    # total and the bar gets its maximum once the count is in. Errors in the
+    # file are reported by the reader.
+    def count():
+        try:
+            total = count_csv_rows(csv_path, finished)
+        except Exception:
+            return
+        if total is not None:
+            set_progress(maximum=total)
+
+    threading.Thread(target=count, daemon=True).start()
+
+
+def iter_csv_chunks(csv_path):
+    # Stream the CSV in chunks so memory stays bounded and the first PDFs
+    # are written before the whole file has been parsed.
+    chunks = _arrow_chunks(csv_path) if PYARROW_AVAILABLE else _pandas_chunks(csv_path)
+    for chunk in chunks:
+        # Every column is str, so one object array converts the whole chunk
+        # to row lists at once, much faster than itertuples.
+        yield list(map(OrderRow._make, prepare_chunk(chunk).to_numpy().tolist()))
+
+
+def _pandas_chunks(csv_path):
+    import pandas as pd
+    with pd.read_csv(
+        csv_path,
+        engine="c",
+        chunksize=CHUNK_SIZE,
+        dtype=str,
+        usecols=lambda c: c in USED_COLUMNS,
+        keep_default_na=False,
+    ) as reader:
+        yield from reader
+
+
+def _arrow_chunks(csv_path):
+    # pyarrow's streaming reader yields one record batch per block of the
+    # file (its pandas engine has no chunksize and would read it all).
+    # Rows whose field count differs from the header are rejected by
+    # pyarrow; they are set aside and read here the way pandas reads them,
+    # ignoring extra fields and leaving missing ones empty, then put back
+    # where they were in the file. pyarrow numbers each rejected row from
+    # the header as row 1, not counting blank lines, but only when it
+    # parses on one thread: with use_threads the number is None.
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    columns = [c for c in header if c in USED_COLUMNS]
+    positions = [header.index(c) for c in columns]
+    ragged = {}  # position among the data rows -> row text
+    # The handler runs on pyarrow's reader thread, which may already be
+    # parsing the next batch; rows pass through a deque into ragged.
+    rejected = deque()
+
+    def set_aside(row):
+        rejected.append((row.number - 2, row.text))
+        return "skip"
+
+    def collect_rejected():
+        while rejected:
+            index, text = rejected.popleft()
+            ragged[index] = text
+
+    def read_ragged(texts):
+        records = [next(csv.reader(io.StringIO(text))) for text in texts]
+        return pd.DataFrame(
+            [[r[i] if i < len(r) else "" for i in positions] for r in records],
+            columns=columns,
+        )
+
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(use_threads=False),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True, invalid_row_handler=set_aside),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns, column_types=dict.fromkeys(columns, pa.string())
+        ),
+    )
+    position = 0  # data rows yielded so far
+    with reader:
+        for batch in reader:
+            # Every rejected row up to the end of this batch is in by now.
+            collect_rejected()
+            frame = batch.to_pandas()
+            pieces = []
+            start = 0
+            while True:
+                # Set-aside rows due at this position come first...
+                texts = []
+                while position in ragged:
+                    texts.append(ragged.pop(position))
+                    position += 1
+                if texts:
+                    pieces.append(read_ragged(texts))
+                if start == len(frame):
+                    break
+                # ...then the batch's rows up to the next set-aside one.
+                take = len(frame) - start
+                later = [p for p in ragged if p > position]
+                if later:
+                    take = min(take, min(later) - position)
+                pieces.append(frame.iloc[start:start + take])
+                start += take
+                position += take
+            if len(pieces) == 1:
+                yield pieces[0]
+            elif pieces:
+                yield pd.concat(pieces, ignore_index=True)
+        collect_rejected()
+        if ragged:
+            yield read_ragged([ragged[p] for p in sorted(ragged)])
+
+
+def prepare_chunk(chunk):
+    # Clean up a whole chunk with pandas string ops rather than per row.
+    chunk = chunk.apply(lambda col: col.str.strip())
+    chunk["Full Name"] = (
+        chunk["First Name (Billing)"] + " " + chunk["Last Name (Billing)"]
+    ).str.strip()
+    chunk["_safe_filename"] = (
+        chunk["Order Number"] + " - " + chunk["Full Name"]
+    ).str.replace(_FILENAME_RE, "_", regex=True) + ".pdf"
+    return chunk.reindex(columns=ROW_COLUMNS, fill_value="")
+
+
+def unique_filename(name, seen):
+    # name with the first free _2, _3, ... suffix before the extension.
+    # seen holds casefolded names: Windows and macOS treat names differing
+    # only in case as the same file.
+    stem, ext = os.path.splitext(name)
+    i = 2
+    while f"{stem}_{i}{ext}".casefold() in seen:
+        i += 1
+    return f"{stem}_{i}{ext}"
+
+
+def row_hash(order):
+    return hashlib.blake2b(json.dumps(order).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def load_hashes(out_dir):
+    try:
+        with open(os.path.join(out_dir, HASH_MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hashes(out_dir, hashes):
+    try:
+        with open(os.path.join(out_dir, HASH_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(hashes, f)
+    except OSError:
+        pass  # the cache is only an optimization
+
+
+_DONE = object()
+
+
+async def render_csv(executor, csv_path, out_dir, hashes, archive=None):
+    # Yield one result per row, None or an error message, as rows finish.
+    results = asyncio.Queue()
+    producer = asyncio.create_task(
+        _render_rows(executor, csv_path, out_dir, hashes, archive, results)
+    )
+    watcher = asyncio.create_task(watch_stop(producer))
+    try:
+        while True:
+            result = await results.get()
+            if result is _DONE:
+                break
+            yield result
+        if not producer.cancelled():  # canceled by Stop
+            await producer  # re-raises CSV errors
+    finally:
+        watcher.cancel()
+        producer.cancel()
+
+
+def _discard_error(future):
+    if not future.cancelled():
+        future.exception()
+
+
+async def _render_rows(executor, csv_path, out_dir, hashes, archive, results):
+    # The pool only renders; finished PDFs are written here by a dedicated
+    # pool of WRITE_LIMIT writer threads, so a slow disk overlaps with
+    # rendering the next batches instead of stalling a worker. The semaphore
+    # bounds how many rendered PDFs wait in memory. Chunks are parsed on
+    # asyncio's default thread, which the writers no longer compete for.
+    # Rows whose PDF already exists with the same content hash are not
+    # rendered again. Rows that would share a filename with an earlier row,
+    # ignoring case, get a numbered one instead of overwriting it.
+    loop = asyncio.get_running_loop()
+    writer = ThreadPoolExecutor(max_workers=WRITE_LIMIT, thread_name_prefix="pdf-writer")
+    writes = asyncio.Semaphore(WRITE_LIMIT)
+    writing = set()
+    seen = set()
+    if archive is None:
+        existing = set(os.listdir(out_dir))
+        prefix = os.path.join(out_dir, "")  # out_dir plus separator, joined once
+
+        def save(name, data):
+            write_file(prefix + name, data)
+    else:
+        # The archive is written from scratch, so every row goes into it.
+        # ZipFile.writestr refuses (ValueError) to start while another
+        # thread is writing an entry, so entries are added one at a time.
+        existing = set()
+        archive_lock = threading.Lock()
 
+        def save(name, data):
+            with archive_lock:
+                archive.writestr(name, data)
 
-def process_csv(csv_path, progress_label, progress_bar, open_folder_button):
+    async def write(order, digest, data):
+        try:
+            await loop.run_in_executor(writer, save, order.safe_filename, data)
+        except Exception as e:
+            results.put_nowait(f"Failed for order {order.Order_Number}.\nDetails: {e}")
+        else:
+            if archive is None:
+                hashes[order.safe_filename] = digest
+            results.put_nowait(None)
+        finally:
+            writes.release()
+
+    rendered = []
+    upcoming = None
+    try:
+        chunks = iter_csv_chunks(csv_path)
+        upcoming = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+        while True:
+            rows = await upcoming
+            if rows is None or stop_requested:
+                break
+            # Parse the next chunk while this one renders.
+            upcoming = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+            pending = []
+            for order in rows:
+                if order.safe_filename.casefold() in seen:
+                    order = order._replace(safe_filename=unique_filename(order.safe_filename, seen))
+                seen.add(order.safe_filename.casefold())
+                digest = row_hash(order)
+                if order.safe_filename in existing and hashes.get(order.safe_filename) == digest:
+                    results.put_nowait(None)
+                else:
+                    pending.append((order, digest))
+            # Submit the whole chunk, as executor.map would, then collect
+            # batches in order.
+            batches = [pending[i:i + RENDER_BATCH] for i in range(0, len(pending), RENDER_BATCH)]
+            rendered.extend(
+                loop.run_in_executor(executor, _render_batch, [order for order, _ in batch], FONT_PATH)
+                for batch in batches
+            )
+            for batch, future in zip(batches, rendered):
+                for (order, digest), (data, error) in zip(batch, await future):
+                    if error:
+                        results.put_nowait(error)
+                        continue
+                    await writes.acquire()
+                    task = asyncio.create_task(write(order, digest, data))
+                    writing.add(task)
+                    task.add_done_callback(writing.discard)
+            rendered.clear()
+        if writing:
+            await asyncio.wait(writing)
+    finally:
+        # On Stop, drop the batches not collected yet: queued ones are
+        # cancelled, and the results (or errors) of those already running
+        # are retrieved and discarded.
+        for future in rendered:
+            if not future.cancel():
+                future.add_done_callback(_discard_error)
+        if upcoming is not None:
+            upcoming.cancel()
+        # Let writes already started finish; on cancel, drop queued ones.
+        writer.shutdown(cancel_futures=True)
+        results.put_nowait(_DONE)
+
+
+def process_csv(csv_path, open_folder_button, bundle=False):
     global stop_requested
+    import pandas as pd
     try:
-        df = pd.read_csv(csv_path)
+        header = pd.read_csv(csv_path, nrows=0)
     except Exception as e:
-        messagebox.showerror("CSV Error", f"Could not read CSV:\n{e}")
-        generate_button.config(state="normal")
-        stop_button.config(state="disabled")
+        call_in_ui(messagebox.showerror, "CSV Error", f"Could not read CSV:\n{e}")
         return
 
-    missing = validate_csv(df)
+    missing = validate_csv(header)
     if missing:
-        messagebox.showerror("CSV Error", f"Missing columns: {', '.join(missing)}")
-        generate_button.config(state="normal")
-        stop_button.config(state="disabled")
+        call_in_ui(messagebox.showerror, "CSV Error", f"Missing columns: {', '.join(missing)}")
         return
 
     out_dir = os.path.join(os.path.dirname(csv_path), "PDF Orders")
     os.makedirs(out_dir, exist_ok=True)
 
-    total = len(df)
-    progress_bar["maximum"] = total
-    progress_bar["value"] = 0
+    if bundle:
+        try:
+            bundle_file = zipfile.ZipFile(os.path.join(out_dir, BUNDLE_NAME), "w", zipfile.ZIP_STORED)
+        except OSError as e:
+            call_in_ui(messagebox.showerror, "ZIP Error", f"Could not create {BUNDLE_NAME}:\n{e}")
+            return
+    else:
+        bundle_file = contextlib.nullcontext()
 
-    for idx, row in df.iterrows():
-        if stop_requested:
-            progress_label.config(text="Canceled by user.")
-            messagebox.showinfo("Canceled", "Generation stopped.")
-            break
+    set_progress(value=0, maximum=0)  # 0 until the rows are counted
+    finished = threading.Event()
+    count_in_background(csv_path, finished)
+    hashes = load_hashes(out_dir)
 
-        progress_label.config(text=f"Processing {idx+1}/{total}…")
-        progress_bar["value"] = idx + 1
+    try:
+        worker_args = (FONT_PATH, _shared_font(FONT_PATH))
+        with ProcessPoolExecutor(initializer=_init_worker, initargs=worker_args) as executor, \
+                bundle_file as archive:
+            asyncio.run(
+                report_results(executor, csv_path, out_dir, hashes, open_folder_button, archive)
+            )
+    except BrokenProcessPool as e:
+        # A worker crashed or was killed (e.g. out of memory) while rendering.
+        call_in_ui(messagebox.showerror, "Render Error", f"A PDF worker process stopped:\n{e}")
+    except Exception as e:
+        call_in_ui(messagebox.showerror, "CSV Error", f"Could not read CSV:\n{e}")
+    finally:
+        finished.set()
+        save_hashes(out_dir, hashes)
 
-        filename = sanitize_filename(
-            f"{row['Order Number']} - {row['First Name (Billing)']} {row['Last Name (Billing)']}.pdf"
-        )
-        out_path = os.path.join(out_dir, filename)
-        try:
-            generate_pdf(row.to_dict(), out_path, row["Order Number"])
-        except Exception:
-            pass
+    stop_requested = False
 
-    else:
-        progress_label.config(text="All done!")
-        messagebox.showinfo("Success", "PDFs generated.")
-        open_folder_button.config(state="normal")
 
-    stop_requested = False
-    generate_button.config(state="normal")
-    stop_button.config(state="disabled")
+async def report_results(executor, csv_path, out_dir, hashes, open_folder_button, archive):
+    # Failed orders don't stop the run; they are counted in the progress
+    # text and listed in one dialog at the end.
+    idx = 0
+    errors = []
+    async for error in render_csv(executor, csv_path, out_dir, hashes, archive):
+        if stop_requested:
+            break
+        idx += 1
+        if error:
+            errors.append(error)
+        failed = f" ({len(errors)} failed)" if errors else ""
+        with progress_lock:
+            total = progress_state["maximum"]
+        of_total = f"/{total}" if total else ""
+        set_progress(value=idx, text=f"Processing {idx}{of_total}…{failed}")
+
+    if stop_requested:
+        set_progress(text="Canceled by user.")
+        call_in_ui(messagebox.showinfo, "Canceled", "Generation stopped.")
+        return
 
+    failures = len(errors)
+    if archive is not None:
+        # Every order that did not fail must have its entry in the bundle.
+        missing = idx - failures - len(archive.infolist())
+        if missing:
+            failures += missing
+            errors.append(f"{missing} orders are missing from {BUNDLE_NAME}.")
+
+    call_in_ui(open_folder_button.config, state="normal")
+    if errors:
+        set_progress(value=idx, maximum=idx, text=f"Done, {failures} of {idx} failed.")
+        shown = "\n\n".join(errors[:MAX_ERRORS_SHOWN])
+        more = len(errors) - MAX_ERRORS_SHOWN
+        if more > 0:
+            shown += f"\n\n…and {more} more."
+        call_in_ui(messagebox.showerror, "PDF Generation Error", shown)
+    else:
+        set_progress(value=idx, maximum=idx, text="All done!")
+        call_in_ui(messagebox.showinfo, "Success", "PDFs generated.")
+
+
+async def watch_stop(producer):
+    # Stop cancels the producer within one poll, even in the middle of a
+    # slow batch, which drops the queued batches. Batches already in a
+    # worker finish first: a worker killed while sending its results leaves
+    # the pool's manager thread waiting on the pipe forever, and the
+    # interpreter could not exit.
+    while not stop_requested:
+        await asyncio.sleep(PROGRESS_POLL_MS / 1000)
+    producer.cancel()
+
+
+def set_progress(**changes):
+    with progress_lock:
+        progress_state.update(changes)
+
+
+def call_in_ui(func, *args, **kwargs):
+    # Tk is not thread-safe: queue the call for poll_progress instead.
+    with progress_lock:
+        ui_calls.append((func, args, kwargs))
+
+
+def poll_progress(progress_label, progress_bar):
+    with progress_lock:
+        state = dict(progress_state)
+        calls = ui_calls[:]
+        ui_calls.clear()
+    if state != progress_shown:
+        # Until the rows are counted the bar has no maximum; in indeterminate
+        # mode it still moves with each finished row.
+        progress_bar["mode"] = "determinate" if state["maximum"] else "indeterminate"
+        progress_bar["maximum"] = state["maximum"] or 100
+        progress_bar["value"] = state["value"]
+        progress_label.config(text=state["text"])
+        progress_shown.update(state)
+    for func, args, kwargs in calls:
+        func(*args, **kwargs)
+    if state["running"]:
+        root.after(PROGRESS_POLL_MS, poll_progress, progress_label, progress_bar)
+    else:
+        generate_button.config(state="normal")
+        stop_button.config(state="disabled")
 
-def start_process_csv(csv_path, progress_label, progress_bar, open_folder_button):
+
+def start_process_csv(csv_path, progress_label, progress_bar, open_folder_button, bundle=False):
     def worker():
-        process_csv(csv_path, progress_label, progress_bar, open_folder_button)
+        try:
+            process_csv(csv_path, open_folder_button, bundle)
+        finally:
+            set_progress(running=False)
 
     generate_button.config(state="disabled")
     stop_button.config(state="normal")
     open_folder_button.config(state="disabled")
+    set_progress(value=0, text="", running=True)
+    root.after(PROGRESS_POLL_MS, poll_progress, progress_label, progress_bar)
     threading.Thread(target=worker, daemon=True).start()
 
 
@@ -212,13 +889,13 @@ def generate():
     if not path:
         messagebox.showerror("Input Error", "Select a CSV first.")
         return
-    start_process_csv(path, progress_label, progress_bar, open_folder_button)
+    start_process_csv(path, progress_label, progress_bar, open_folder_button, bundle_var.get())
 
 
 def stop_process():
     global stop_requested
     stop_requested = True
-    progress_label.config(text="Canceling…")
+    set_progress(text="Canceling…")
 
 
 def open_output_folder():
@@ -246,6 +923,7 @@ def show_instructions():
         "2. Launch this application.\n"
         "3. Drag & drop your CSV onto the entry field—or click Browse to select it.\n"
         "4. Click Generate PDFs.\n"
+        f"   • Check Bundle to ZIP to get a single {BUNDLE_NAME} instead of one file per order.\n"
         "   • Progress will show below.\n"
         "   • Click Stop to cancel at any time.\n\n"
         "5. When complete, click Open Output Folder to view your PDFs.\n"
@@ -268,60 +946,77 @@ def quit_app():
 
 
 # ─── GUI SETUP ────────────────────────────────────────────
-if DND_AVAILABLE:
-    root = TkinterDnD.Tk()
-else:
-    root = tk.Tk()
-
-root.title("Order PDF Generator")
-root.geometry("800x340")
-
-# Menu bar
-menubar = tk.Menu(root)
-helpmenu = tk.Menu(menubar, tearoff=0)
-helpmenu.add_command(label="Instructions", command=show_instructions)
-helpmenu.add_command(label="About", command=show_about)
-menubar.add_cascade(label="Help", menu=helpmenu)
-root.config(menu=menubar)
-
-csv_path_var = tk.StringVar()
-main = tk.Frame(root, padx=10, pady=10)
-main.pack(fill="both", expand=True)
-
-tk.Label(main, text="Select your CSV file:")\
-    .grid(row=0, column=0, sticky="e", padx=5, pady=5)
-
-csv_entry = tk.Entry(main, textvariable=csv_path_var, width=50)
-csv_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
-
-if DND_AVAILABLE:
-    csv_entry.drop_target_register(DND_FILES)
-    csv_entry.dnd_bind(
-        '<<Drop>>',
-        lambda e: csv_path_var.set(e.data.strip('{}'))
-    )
+def main():
+    # Tk is only created here, so worker processes that import this
+    # module (spawn start method) never open a window.
+    global root, csv_path_var, bundle_var, generate_button, stop_button
+    global progress_label, progress_bar, open_folder_button
+
+    if DND_AVAILABLE:
+        root = TkinterDnD.Tk()
+    else:
+        root = tk.Tk()
+
+    root.title("Order PDF Generator")
+    root.geometry("800x340")
+
+    # Menu bar
+    menubar = tk.Menu(root)
+    helpmenu = tk.Menu(menubar, tearoff=0)
+    helpmenu.add_command(label="Instructions", command=show_instructions)
+    helpmenu.add_command(label="About", command=show_about)
+    menubar.add_cascade(label="Help", menu=helpmenu)
+    root.config(menu=menubar)
+
+    csv_path_var = tk.StringVar()
+    frame = tk.Frame(root, padx=10, pady=10)
+    frame.pack(fill="both", expand=True)
+
+    tk.Label(frame, text="Select your CSV file:")\
+        .grid(row=0, column=0, sticky="e", padx=5, pady=5)
+
+    csv_entry = tk.Entry(frame, textvariable=csv_path_var, width=50)
+    csv_entry.grid(row=0, column=1, padx=5, pady=5, sticky="w")
+
+    if DND_AVAILABLE:
+        csv_entry.drop_target_register(DND_FILES)
+        csv_entry.dnd_bind(
+            '<<Drop>>',
+            lambda e: csv_path_var.set(e.data.strip('{}'))
+        )
 
-tk.Button(main, text="Browse", command=browse_file)\
-    .grid(row=0, column=2, padx=5, pady=5)
+    tk.Button(frame, text="Browse", command=browse_file)\
+        .grid(row=0, column=2, padx=5, pady=5)
 
-generate_button = tk.Button(main, text="Generate PDFs", command=generate)
-generate_button.grid(row=1, column=0, pady=10, sticky="e")
+    generate_button = tk.Button(frame, text="Generate PDFs", command=generate)
+    generate_button.grid(row=1, column=0, pady=10, sticky="e")
 
-stop_button = tk.Button(main, text="Stop", command=stop_process, state="disabled")
-stop_button.grid(row=1, column=1, pady=10, sticky="w")
+    stop_button = tk.Button(frame, text="Stop", command=stop_process, state="disabled")
+    stop_button.grid(row=1, column=1, pady=10, sticky="w")
 
-progress_label = tk.Label(main, text="")
-progress_label.grid(row=2, column=0, columnspan=3, pady=5)
+    bundle_var = tk.BooleanVar()
+    tk.Checkbutton(frame, text="Bundle to ZIP", variable=bundle_var)\
+        .grid(row=1, column=2, pady=10, sticky="w")
 
-progress_bar = ttk.Progressbar(main, orient="horizontal", length=400, mode="determinate")
-progress_bar.grid(row=3, column=0, columnspan=3, pady=5)
+    progress_label = tk.Label(frame, text="")
+    progress_label.grid(row=2, column=0, columnspan=3, pady=5)
 
-open_folder_button = tk.Button(
-    main, text="Open Output Folder", command=open_output_folder, state="disabled"
-)
-open_folder_button.grid(row=4, column=0, columnspan=3, pady=5)
+    progress_bar = ttk.Progressbar(frame, orient="horizontal", length=400, mode="determinate")
+    progress_bar.grid(row=3, column=0, columnspan=3, pady=5)
+
+    open_folder_button = tk.Button(
+        frame, text="Open Output Folder", command=open_output_folder, state="disabled"
+    )
+    open_folder_button.grid(row=4, column=0, columnspan=3, pady=5)
+
+    tk.Button(frame, text="Quit", command=quit_app)\
+        .grid(row=5, column=0, columnspan=3, pady=5)
+
+    root.mainloop()
 
-tk.Button(main, text="Quit", command=quit_app)\
-    .grid(row=5, column=0, columnspan=3, pady=5)
 
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # In a frozen Windows executable, lets pool workers run as workers
+    # instead of starting the GUI again.
+    multiprocessing.freeze_support()
+    main()